@@ -5,15 +5,29 @@ Registra dados para análise de estabilidade e drift
 """
 
 import time
-import csv
 from datetime import datetime
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+from numpy.lib.stride_tricks import sliding_window_view
 import threading
-import queue
 import os
 
+# Número de linhas acumuladas antes de cada escrita em disco
+LOG_BATCH_SIZE = 32
+
+# Intervalo máximo (s) até as linhas registradas estarem gravadas no disco
+LOG_FSYNC_INTERVAL = 1.0
+
+LOG_FIELDNAMES = [
+    'timestamp', 'elapsed_time', 'distance_cm', 'distance_raw_cm',
+    'voltage_v', 'voltage_std', 'kalman_p', 'temperature_c'
+]
+
+# Máximo de pontos no gráfico de dispersão da análise
+SCATTER_MAX_POINTS = 2000
+
+# Formato de uma linha do CSV, na mesma ordem de LOG_FIELDNAMES
+LOG_ROW_FMT = "%.3f,%.6f,%.4f,%.4f,%.6f,%.6f,%.6e,%.2f\n"
+
 class SensorDataLogger:
     """Logger de dados com visualização em tempo real"""
 
@@ -21,7 +35,6 @@ class SensorDataLogger:
         self.sensor = sensor
         self.log_dir = log_dir
         self.running = False
-        self.data_queue = queue.Queue()
 
         # Cria diretório de logs
         if not os.path.exists(log_dir):
@@ -31,29 +44,44 @@ class SensorDataLogger:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.log_file = f"{log_dir}/sensor_log_{timestamp}.csv"
 
-        # Buffers para plotagem
+        # Buffer circular compartilhado entre a thread de logging (única
+        # escritora) e a plotagem (única leitora), sem locks. O slot extra
+        # garante que a leitora nunca copie a posição sendo sobrescrita.
         self.max_points = 500
-        self.times = []
-        self.distances = []
-        self.voltages = []
+        self._ring_size = self.max_points + 1
+        self._t = np.empty(self._ring_size, dtype=np.float64)
+        self._d = np.empty(self._ring_size, dtype=np.float64)
+        self._v = np.empty(self._ring_size, dtype=np.float64)
+        self._head = 0  # Total de amostras publicadas (só a escritora altera)
         self.temperatures = []  # Para futura expansão
 
+        # Arquivo de log aberto durante a sessão e linhas pendentes
+        self._log_fp = None
+        self._pending = []
+
         # Estatísticas
         self.total_readings = 0
         self.session_start = None
 
+        # Figura de análise reutilizada entre chamadas de analyze_log
+        self._analysis_fig = None
+        self._analysis_axes = None
+
+        # Buffers reutilizados pela média móvel da análise
+        self._ma_cumsum = None
+        self._ma_buf = None
+
     def start_logging(self, interval=0.1):
         """Inicia o logging em thread separada"""
         self.running = True
         self.session_start = time.time()
+        self.session_start_ns = time.perf_counter_ns()
 
-        # Cria arquivo CSV com cabeçalho
-        with open(self.log_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                'timestamp', 'elapsed_time', 'distance_cm', 'distance_raw_cm',
-                'voltage_v', 'voltage_std', 'kalman_p', 'temperature_c'
-            ])
+        # Abre o arquivo CSV uma única vez e escreve o cabeçalho
+        self._log_fp = open(self.log_file, 'w', newline='', buffering=1 << 16)
+        self._log_fp.write(",".join(LOG_FIELDNAMES) + "\n")
+        self._pending = []
+        self._last_fsync = time.monotonic()
 
         # Thread de logging
         self.log_thread = threading.Thread(
@@ -67,57 +95,82 @@ class SensorDataLogger:
 
     def _logging_loop(self, interval):
         """Loop principal de logging"""
+        # Prazos absolutos: um ciclo lento não atrasa os seguintes
+        next_deadline = time.monotonic()
+
         while self.running:
             try:
-                # Coleta dados
-                timestamp = datetime.now()
-                elapsed = time.time() - self.session_start
+                # Coleta dados (o horário de parede é derivado do início da sessão)
+                elapsed = (time.perf_counter_ns() - self.session_start_ns) * 1e-9
 
                 # Leituras do sensor
-                voltage = self.sensor.read_voltage(samples=5)
-                distance = self.sensor.read_distance(filtered=True)
-                distance_raw = self.sensor.voltage_to_distance(voltage)
+                voltage, distance, distance_raw = self.sensor.read_voltage_and_distance(samples=5)
 
                 # Estatísticas do buffer
-                voltage_std = np.std(list(self.sensor.voltage_buffer)) if len(self.sensor.voltage_buffer) > 1 else 0
+                voltage_std = self.sensor.voltage_std()
 
                 # Temperatura (placeholder para sensor futuro)
                 temperature = 25.0  # Valor fixo por enquanto
 
-                # Dados para log
-                log_data = {
-                    'timestamp': timestamp.isoformat(),
-                    'elapsed_time': elapsed,
-                    'distance_cm': distance,
-                    'distance_raw_cm': distance_raw,
-                    'voltage_v': voltage,
-                    'voltage_std': voltage_std,
-                    'kalman_p': self.sensor.kalman_p,
-                    'temperature_c': temperature
-                }
-
-                # Salva no arquivo
-                with open(self.log_file, 'a', newline='') as f:
-                    writer = csv.DictWriter(f, fieldnames=log_data.keys())
-                    writer.writerow(log_data)
-
-                # Adiciona à fila para plotagem
-                self.data_queue.put(log_data)
+                # Linha do log (tupla na ordem de LOG_FIELDNAMES)
+                row = (
+                    self.session_start + elapsed, elapsed, distance, distance_raw,
+                    voltage, voltage_std, self.sensor.kalman_p, temperature
+                )
+
+                # Acumula e grava em lotes
+                self._pending.append(LOG_ROW_FMT % row)
+                if (len(self._pending) >= LOG_BATCH_SIZE or
+                        time.monotonic() - self._last_fsync >= LOG_FSYNC_INTERVAL):
+                    self._flush_pending()
+
+                # Publica no buffer circular da plotagem: escreve o slot e só
+                # depois avança o índice
+                i = self._head % self._ring_size
+                self._t[i] = elapsed
+                self._d[i] = distance
+                self._v[i] = voltage
+                self._head += 1
 
                 self.total_readings += 1
 
-                # Aguarda intervalo
-                time.sleep(interval)
+                # Aguarda até o próximo prazo
+                next_deadline += interval
+                remaining = next_deadline - time.monotonic()
+                if remaining > 0:
+                    time.sleep(remaining)
+                elif remaining < -interval:
+                    # Atrasou mais de um intervalo: ressincroniza
+                    next_deadline = time.monotonic()
 
             except Exception as e:
                 print(f"Erro no logging: {e}")
                 time.sleep(1)
+                next_deadline = time.monotonic()
+
+    def _flush_pending(self, sync=False):
+        """Grava as linhas pendentes e faz fsync no máximo uma vez por intervalo"""
+        if self._pending:
+            self._log_fp.write("".join(self._pending))
+            self._pending.clear()
+        self._log_fp.flush()
+
+        now = time.monotonic()
+        if sync or now - self._last_fsync >= LOG_FSYNC_INTERVAL:
+            os.fsync(self._log_fp.fileno())
+            self._last_fsync = now
 
     def stop_logging(self):
         """Para o logging"""
         self.running = False
         if hasattr(self, 'log_thread'):
             self.log_thread.join()
+
+        # Grava o restante e fecha o arquivo
+        if self._log_fp is not None:
+            self._flush_pending(sync=True)
+            self._log_fp.close()
+            self._log_fp = None
         print(f"\n✓ Logging finalizado")
         print(f"  Total de leituras: {self.total_readings}")
         print(f"  Arquivo: {self.log_file}")
@@ -129,45 +182,48 @@ class SensorDataLogger:
 
         print(f"\nAnalisando: {filename}")
 
-        # Carrega dados
-        data = {
-            'elapsed_time': [],
-            'distance_cm': [],
-            'voltage_v': [],
-            'voltage_std': []
-        }
-
-        with open(filename, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                data['elapsed_time'].append(float(row['elapsed_time']))
-                data['distance_cm'].append(float(row['distance_cm']))
-                data['voltage_v'].append(float(row['voltage_v']))
-                data['voltage_std'].append(float(row['voltage_std']))
+        # Carrega apenas as colunas numéricas usadas na análise. As medidas
+        # cabem em float32; o tempo fica em float64 para não perder resolução
+        # em sessões de várias horas.
+        columns = [
+            ('elapsed_time', np.float64),
+            ('distance_cm', np.float32),
+            ('voltage_v', np.float32),
+            ('voltage_std', np.float32),
+        ]
+        table = np.loadtxt(
+            filename, delimiter=',', skiprows=1, ndmin=1, dtype=columns,
+            usecols=[LOG_FIELDNAMES.index(name) for name, _ in columns]
+        )
 
-        if not data['elapsed_time']:
+        if table.size == 0:
             print("Arquivo vazio!")
             return
 
-        # Converte para arrays numpy
-        for key in data:
-            data[key] = np.array(data[key])
+        data = {name: np.ascontiguousarray(table[name]) for name, _ in columns}
+
+        # Estatísticas (calculadas uma vez e reaproveitadas nos gráficos)
+        stats = {
+            'distance_mean': data['distance_cm'].mean(),
+            'distance_std': data['distance_cm'].std(),
+            'voltage_mean': data['voltage_v'].mean(),
+            'voltage_std': data['voltage_v'].std(),
+        }
 
-        # Estatísticas
         print("\nESTATÍSTICAS GERAIS:")
         print(f"  Duração: {data['elapsed_time'][-1]:.1f}s")
         print(f"  Amostras: {len(data['elapsed_time'])}")
         print(f"  Taxa média: {len(data['elapsed_time'])/data['elapsed_time'][-1]:.1f} Hz")
 
         print("\nDISTÂNCIA:")
-        print(f"  Média: {np.mean(data['distance_cm']):.2f} cm")
-        print(f"  Desvio padrão: {np.std(data['distance_cm']):.2f} cm")
+        print(f"  Média: {stats['distance_mean']:.2f} cm")
+        print(f"  Desvio padrão: {stats['distance_std']:.2f} cm")
         print(f"  Mínimo: {np.min(data['distance_cm']):.2f} cm")
         print(f"  Máximo: {np.max(data['distance_cm']):.2f} cm")
 
         print("\nTENSÃO:")
-        print(f"  Média: {np.mean(data['voltage_v']):.3f} V")
-        print(f"  Desvio padrão: {np.std(data['voltage_v']):.3f} V")
+        print(f"  Média: {stats['voltage_mean']:.3f} V")
+        print(f"  Desvio padrão: {stats['voltage_std']:.3f} V")
         print(f"  Ruído médio: {np.mean(data['voltage_std']):.4f} V")
 
         # Análise de drift
@@ -187,25 +243,40 @@ class SensorDataLogger:
 
         # Análise de estabilidade
         if len(data['distance_cm']) > 10:
-            # Calcula desvio padrão em janelas
-            window_size = min(50, len(data['distance_cm'])//10)
-            stds = []
-
-            for i in range(0, len(data['distance_cm']) - window_size, window_size//2):
-                window = data['distance_cm'][i:i+window_size]
-                stds.append(np.std(window))
+            # Calcula desvio padrão em janelas com 50% de sobreposição,
+            # todas de uma vez sobre uma visão sem cópia dos dados
+            n = len(data['distance_cm'])
+            window_size = min(50, n//10)
+            step = max(1, window_size//2)
+            windows = sliding_window_view(data['distance_cm'], window_size)[:n - window_size:step]
+            stds = windows.std(axis=1)
 
             print("\nESTABILIDADE:")
-            print(f"  Desvio padrão mínimo: {np.min(stds):.3f} cm")
-            print(f"  Desvio padrão máximo: {np.max(stds):.3f} cm")
-            print(f"  Variação da estabilidade: {np.std(stds):.4f}")
+            print(f"  Desvio padrão mínimo: {stds.min():.3f} cm")
+            print(f"  Desvio padrão máximo: {stds.max():.3f} cm")
+            print(f"  Variação da estabilidade: {stds.std():.4f}")
 
         # Plota análise
-        self.plot_analysis(data)
+        self.plot_analysis(data, stats)
 
-    def plot_analysis(self, data):
+    def plot_analysis(self, data, stats=None):
         """Plota gráficos de análise"""
-        fig, axes = plt.subplots(3, 2, figsize=(15, 10))
+        # Importado só aqui: o matplotlib é pesado e só é usado para plotar
+        import matplotlib.pyplot as plt
+
+        if stats is None:
+            stats = {
+                'distance_mean': data['distance_cm'].mean(),
+                'distance_std': data['distance_cm'].std(),
+            }
+
+        # Reaproveita a figura anterior se a janela ainda estiver aberta
+        if self._analysis_fig is None or not plt.fignum_exists(self._analysis_fig.number):
+            self._analysis_fig, self._analysis_axes = plt.subplots(3, 2, figsize=(15, 10))
+        else:
+            for ax in self._analysis_axes.flat:
+                ax.cla()
+        fig, axes = self._analysis_fig, self._analysis_axes
         fig.suptitle('Análise de Dados do Sensor GP2Y0A41SK0F', fontsize=16)
 
         # 1. Distância vs Tempo
@@ -221,7 +292,7 @@ class SensorDataLogger:
         ax.hist(data['distance_cm'], bins=50, color='blue', alpha=0.7, edgecolor='black')
         ax.set_xlabel('Distância (cm)')
         ax.set_ylabel('Frequência')
-        ax.set_title(f'Distribuição de Distâncias (μ={np.mean(data["distance_cm"]):.2f}, σ={np.std(data["distance_cm"]):.2f})')
+        ax.set_title(f'Distribuição de Distâncias (μ={stats["distance_mean"]:.2f}, σ={stats["distance_std"]:.2f})')
         ax.grid(True, alpha=0.3)
 
         # 3. Tensão vs Tempo
@@ -234,7 +305,13 @@ class SensorDataLogger:
 
         # 4. Correlação Tensão vs Distância
         ax = axes[1, 1]
-        ax.scatter(data['voltage_v'], data['distance_cm'], alpha=0.5, s=1)
+        # Subamostra logs longos: visualmente equivalente e bem mais leve
+        n = len(data['voltage_v'])
+        if n > SCATTER_MAX_POINTS:
+            idx = np.random.default_rng(0).choice(n, SCATTER_MAX_POINTS, replace=False)
+            ax.scatter(data['voltage_v'][idx], data['distance_cm'][idx], alpha=0.5, s=1)
+        else:
+            ax.scatter(data['voltage_v'], data['distance_cm'], alpha=0.5, s=1)
         ax.set_xlabel('Tensão (V)')
         ax.set_ylabel('Distância (cm)')
         ax.set_title('Correlação Tensão-Distância')
@@ -252,8 +329,8 @@ class SensorDataLogger:
         ax = axes[2, 1]
         window = min(100, len(data['distance_cm'])//10)
         if window > 1:
-            moving_avg = np.convolve(data['distance_cm'], np.ones(window)/window, mode='valid')
-            time_avg = data['elapsed_time'][window//2:-window//2+1]
+            moving_avg = self._moving_average(data['distance_cm'], window)
+            time_avg = data['elapsed_time'][window//2:window//2 + len(moving_avg)]
             ax.plot(time_avg, moving_avg, 'b-', label=f'Média móvel ({window} amostras)')
             ax.plot(data['elapsed_time'], data['distance_cm'], 'gray', alpha=0.2, linewidth=0.5)
         else:
@@ -269,69 +346,104 @@ class SensorDataLogger:
 
         # Salva figura
         plot_file = self.log_file.replace('.csv', '_analysis.png')
-        plt.savefig(plot_file, dpi=150)
+        fig.savefig(plot_file, dpi=150)
         print(f"\n✓ Gráfico salvo: {plot_file}")
 
         plt.show()
 
+        # Janela fechada pelo usuário: libera a figura
+        if not plt.fignum_exists(fig.number):
+            plt.close(fig)
+            self._analysis_fig = None
+            self._analysis_axes = None
+
+    def _moving_average(self, x, window):
+        """Média móvel via soma acumulada, reaproveitando buffers entre chamadas"""
+        n = len(x)
+        m = n - window + 1
+
+        # Só realoca quando o log atual é maior que os anteriores
+        if self._ma_cumsum is None or self._ma_cumsum.size < n + 1:
+            self._ma_cumsum = np.empty(n + 1, dtype=np.float64)
+            self._ma_buf = np.empty(m, dtype=np.float64)
+        elif self._ma_buf.size < m:
+            self._ma_buf = np.empty(m, dtype=np.float64)
+
+        c = self._ma_cumsum[:n + 1]
+        c[0] = 0.0
+        np.cumsum(x, dtype=np.float64, out=c[1:])
+
+        out = self._ma_buf[:m]
+        np.subtract(c[window:], c[:-window], out=out)
+        np.divide(out, window, out=out)
+        return out
+
+    def _plot_snapshot(self):
+        """Copia o buffer circular em ordem cronológica (tempos, distâncias, tensões)"""
+        head = self._head
+        count = min(head, self.max_points)
+        idx = np.arange(head - count, head) % self._ring_size
+        return self._t[idx], self._d[idx], self._v[idx]
+
     def live_plot(self):
         """Plotagem em tempo real"""
+        import matplotlib.pyplot as plt
+        from matplotlib.animation import FuncAnimation
+
         fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(10, 8))
         fig.suptitle('Monitor em Tempo Real - GP2Y0A41SK0F')
 
-        def update_plot(frame):
-            # Processa dados da fila
-            while not self.data_queue.empty():
-                try:
-                    data = self.data_queue.get_nowait()
+        # Linhas criadas uma única vez; cada quadro só atualiza os dados
+        line_d, = ax1.plot([], [], 'b-')
+        ax1.set_ylabel('Distância (cm)')
+        ax1.set_title('Aguardando...')
+        ax1.grid(True, alpha=0.3)
 
-                    self.times.append(data['elapsed_time'])
-                    self.distances.append(data['distance_cm'])
-                    self.voltages.append(data['voltage_v'])
+        line_v, = ax2.plot([], [], 'g-')
+        ax2.set_ylabel('Tensão (V)')
+        ax2.set_title('Aguardando...')
+        ax2.grid(True, alpha=0.3)
 
-                    # Limita número de pontos
-                    if len(self.times) > self.max_points:
-                        self.times.pop(0)
-                        self.distances.pop(0)
-                        self.voltages.pop(0)
-                except:
-                    break
+        ax3.set_xlabel('Distância (cm)')
+        ax3.set_ylabel('Frequência')
+
+        plt.tight_layout()
 
-            if not self.times:
-                return
+        def update_plot(frame):
+            if self._head == 0:
+                return line_d, line_v
 
-            # Limpa e plota
-            ax1.clear()
-            ax2.clear()
-            ax3.clear()
+            times, distances, voltages = self._plot_snapshot()
 
             # Distância
-            ax1.plot(self.times, self.distances, 'b-')
-            ax1.set_ylabel('Distância (cm)')
-            ax1.set_title(f'Última: {self.distances[-1]:.2f}cm' if self.distances else 'Aguardando...')
-            ax1.grid(True, alpha=0.3)
+            line_d.set_data(times, distances)
+            ax1.relim()
+            ax1.autoscale_view()
+            ax1.set_title(f'Última: {distances[-1]:.2f}cm')
 
             # Tensão
-            ax2.plot(self.times, self.voltages, 'g-')
-            ax2.set_ylabel('Tensão (V)')
-            ax2.set_title(f'Última: {self.voltages[-1]:.3f}V' if self.voltages else 'Aguardando...')
-            ax2.grid(True, alpha=0.3)
-
-            # Histograma
-            if len(self.distances) > 10:
-                ax3.hist(self.distances[-min(100, len(self.distances)):], bins=20, alpha=0.7)
-                ax3.set_xlabel('Distância (cm)')
-                ax3.set_ylabel('Frequência')
-                mean_d = np.mean(self.distances[-100:])
-                std_d = np.std(self.distances[-100:])
+            line_v.set_data(times, voltages)
+            ax2.relim()
+            ax2.autoscale_view()
+            ax2.set_title(f'Última: {voltages[-1]:.3f}V')
+
+            # Histograma (os retângulos mudam a cada quadro)
+            if len(distances) > 10:
+                recent = distances[-100:]
+                for patch in list(ax3.patches):
+                    patch.remove()
+                ax3.hist(recent, bins=20, alpha=0.7, color='tab:blue')
+                ax3.relim()
+                ax3.autoscale_view()
+                mean_d = recent.mean()
+                std_d = recent.std()
                 ax3.set_title(f'Últimas 100: μ={mean_d:.2f}cm, σ={std_d:.2f}cm')
 
-            ax3.set_xlabel('Tempo (s)')
-
-            plt.tight_layout()
+            return line_d, line_v
 
-        # Animação
-        ani = FuncAnimation(fig, update_plot, interval=100, blit=False)
+        # Animação (sem blit: títulos e limites dos eixos mudam a cada quadro)
+        ani = FuncAnimation(fig, update_plot, interval=100, blit=False,
+                            cache_frame_data=False)
 
         print("\nPlotagem em tempo real iniciada")
         print("Feche a janela para parar")
@@ -412,18 +524,25 @@ def main():
                 logger.stop_logging()
 
         elif choice == '3':
-            # Lista arquivos de log
-            import glob
-            logs = glob.glob("sensor_logs/*.csv")
+            # Lista arquivos de log (mais recentes primeiro); o scandir já traz
+            # o stat de cada entrada junto com a leitura do diretório
+            try:
+                with os.scandir("sensor_logs") as it:
+                    entries = [(e.name, e.path, e.stat()) for e in it
+                               if e.name.endswith(".csv") and e.is_file()]
+            except FileNotFoundError:
+                entries = []
 
-            if not logs:
+            if not entries:
                 print("Nenhum arquivo de log encontrado")
                 continue
 
+            entries.sort(key=lambda e: e[2].st_mtime, reverse=True)
+            logs = [path for _, path, _ in entries]
+
             print("\nArquivos disponíveis:")
-            for i, log in enumerate(logs, 1):
-                size = os.path.getsize(log) / 1024
-                print(f"{i}. {os.path.basename(log)} ({size:.1f} KB)")
+            for i, (name, _, st) in enumerate(entries, 1):
+                print(f"{i}. {name} ({st.st_size / 1024:.1f} KB)")
 
             try:
                 idx = int(input("\nNúmero do arquivo (0 = cancelar): "))
@@ -24,6 +24,24 @@ echo "Instalando bibliotecas Python..."
 pip3 install --break-system-packages adafruit-circuitpython-ads1x15
 pip3 install --break-system-packages numpy scipy matplotlib
 
+# Pacotes opcionais: o sistema funciona sem eles (numba acelera os filtros,
+# orjson a leitura da calibração, smbus2 a leitura direta do test_connection).
+# Instalados à parte para que a falta de wheel (ex.: Pi OS 32 bits) não
+# impeça a instalação dos obrigatórios
+echo "Instalando bibliotecas opcionais..."
+pip3 install --break-system-packages numba || echo "opcional: numba não instalado (filtros rodam em Python puro)"
+pip3 install --break-system-packages orjson || echo "opcional: orjson não instalado (usa o módulo json)"
+pip3 install --break-system-packages smbus2 || echo "opcional: smbus2 não instalado (test_connection usa o driver Adafruit)"
+
+# pigpio: necessário apenas para o teste do motor (test_mottor.py)
+echo "Instalando pigpio (teste do motor)..."
+if sudo apt-get install -y pigpio python3-pigpio; then
+    # Daemon pigpiod (gera os pulsos do motor por DMA)
+    sudo systemctl enable --now pigpiod
+else
+    echo "opcional: pigpio não instalado (test_mottor.py não funcionará)"
+fi
+
 # Adiciona usuário ao grupo i2c
 sudo usermod -a -G i2c $USER
 
@@ -4,19 +4,158 @@ Sistema de Alta Precisão para Sensor GP2Y0A41SK0F
 Sensor de distância IR Sharp (4-30cm) com ADS1115
 """
 
+import sys
 import time
+import math
+import bisect
 import board
 import busio
 from adafruit_ads1x15 import ADS1115 as ADS
-from adafruit_ads1x15 import AnalogIn
+from adafruit_ads1x15 import AnalogIn, ads1x15
 import numpy as np
-from scipy import signal, interpolate
-from collections import deque
 import json
-import matplotlib.pyplot as plt
+import os
+import zipfile
 from datetime import datetime
 import threading
 
+try:
+    from numba import njit
+except ImportError:
+    # numba é opcional: sem ele as funções compiladas rodam em Python puro
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import orjson
+except ImportError:
+    # orjson é opcional: sem ele a calibração usa o módulo json padrão
+    orjson = None
+
+# Tamanho do buffer circular da amostragem em segundo plano
+SAMPLE_RING_SIZE = 256
+
+# Erros de I2C consecutivos tolerados pela thread de amostragem antes de parar
+SAMPLE_MAX_ERRORS = 5
+
+# Intervalo maior que este múltiplo da média indica pausa (ex.: menu entre
+# sessões de teste) e reinicia a estimativa de taxa em vez de entrar na média
+RATE_GAP_FACTOR = 10
+
+# Tempo máximo de espera pela primeira amostra da thread de fundo (s)
+SAMPLE_START_TIMEOUT = 1.0
+
+# Esperas menores que isso são feitas em espera ativa: o time.sleep acorda
+# com dezenas de µs de atraso, comparável ao próprio intervalo
+SPIN_THRESHOLD = 0.001
+
+# Tabela tensão → distância: 16K entradas cobrindo o fundo de escala do
+# ADS1115 com ganho 1 (0 a 4.096V, passo de 0.25mV)
+LUT_SIZE = 16384
+LUT_V_MAX = 4.096
+LUT_SCALE = (LUT_SIZE - 1) / LUT_V_MAX
+
+# O modo de teste lê a 20Hz mas só redesenha a linha a cada N leituras (4Hz)
+DISPLAY_EVERY = 5
+
+# Barras de progresso do modo de teste, pré-montadas (0 a 30 blocos)
+BAR_WIDTH = 30
+PROGRESS_BARS = tuple("█" * i + "░" * (BAR_WIDTH - i) for i in range(BAR_WIDTH + 1))
+
+@njit(cache=True, fastmath=True)
+def _kalman_step(x, p, z, q, r):
+    """Passo do filtro Kalman escalar, retorna (estimativa, erro)"""
+    # Predição
+    p = p + q
+
+    # Atualização
+    k = p / (p + r)
+    x = x + k * (z - x)
+    p = (1 - k) * p
+
+    return x, p
+
+@njit(cache=True, fastmath=True)
+def _filter_step(z, use_kalman, x, p, q, r, dbuf, idx, count, weights, weights_full):
+    """
+    Filtra uma distância: Kalman, grava no buffer circular e aplica a média
+    móvel ponderada. Retorna (distância, x, p, idx, count)
+    """
+    if use_kalman:
+        x, p = _kalman_step(x, p, z, q, r)
+        z = x
+
+    size = len(dbuf)
+    dbuf[idx] = z
+    idx = (idx + 1) % size
+    if count < size:
+        count += 1
+
+    # Média móvel ponderada (peso maior para as leituras mais recentes)
+    distance = z
+    if count > 3:
+        # Buffer cheio: pesos alinhados com a posição da mais antiga
+        w = weights_full[idx] if count == size else weights[count]
+        distance = 0.0
+        for i in range(count):
+            distance += dbuf[i] * w[i]
+
+    return distance, x, p, idx, count
+
+@njit(cache=True)
+def _lut_lookup(lut, v):
+    """Consulta a tabela tensão → distância na entrada mais próxima"""
+    i = int(v * LUT_SCALE + 0.5)
+    if i < 0:
+        i = 0
+    elif i >= LUT_SIZE:
+        i = LUT_SIZE - 1
+    return lut[i]
+
+@njit(cache=True, fastmath=True)
+def _acquire_batch(voltages, lut, use_kalman, x, p, q, r):
+    """
+    Converte um lote de tensões pela tabela e aplica o Kalman em sequência,
+    em uma única passada. Retorna (distâncias, x, p)
+    """
+    out = np.empty(len(voltages), dtype=np.float64)
+    for i in range(len(voltages)):
+        z = _lut_lookup(lut, voltages[i])
+        if use_kalman:
+            x, p = _kalman_step(x, p, z, q, r)
+            z = x
+        out[i] = z
+    return out, x, p
+
+@njit(cache=True, fastmath=True)
+def _default_curve(v, a, b, c, mn, mx):
+    """Curva padrão do sensor para um escalar, saturada em [mn, mx]"""
+    if v < 0.25:
+        return mx
+    if v > 3.3:
+        return mn
+    d = a / (v - b) - c
+    return mn if d < mn else (mx if d > mx else d)
+
+def _mean_std(values):
+    """Média e desvio padrão em uma única passada (acumulando em float64)"""
+    v = values.astype(np.float64)
+    n = len(v)
+    mean = v.sum() / n
+    var = np.dot(v, v) / n - mean * mean
+    return mean, math.sqrt(var) if var > 0 else 0.0
+
+def _precise_sleep(dt):
+    """Espera dt segundos; abaixo de SPIN_THRESHOLD usa espera ativa"""
+    if dt >= SPIN_THRESHOLD:
+        time.sleep(dt)
+        return
+    deadline = time.perf_counter() + dt
+    while time.perf_counter() < deadline:
+        pass
+
 class GP2Y0A41SK0F:
     """Classe para sensor de distância Sharp GP2Y0A41SK0F com calibração avançada"""
 
@@ -33,6 +172,11 @@ class GP2Y0A41SK0F:
         self.ads = ADS(self.i2c)
         self.ads.gain = gain
         self.ads.data_rate = samples_rate
+        # Conversão contínua: cada leitura não dispara um single-shot no I2C
+        self.ads.mode = ads1x15.Mode.CONTINUOUS
+
+        # Intervalo entre conversões do ADC, usado para cadenciar as leituras
+        self._sample_period = 1.0 / samples_rate
 
         # Canal analógico
         channels = [ads1x15.Pin.A0, ads1x15.Pin.P1, ads1x15.Pin.P2, ads1x15.Pin.P3]
@@ -44,14 +188,38 @@ class GP2Y0A41SK0F:
         self.voltage_at_4cm = 3.1  # V típico
         self.voltage_at_30cm = 0.3 # V típico
 
-        # Buffers para filtragem
+        # Buffers para filtragem (float32 basta para a resolução do ADC)
         self.buffer_size = 10
-        self.voltage_buffer = deque(maxlen=self.buffer_size)
-        self.distance_buffer = deque(maxlen=self.buffer_size)
+        self._vbuf = np.zeros(self.buffer_size, dtype=np.float32)
+        self._vbuf_idx = 0
+        self._vbuf_count = 0
+        self._dbuf = np.zeros(self.buffer_size, dtype=np.float32)
+        self._dbuf_idx = 0
+        self._dbuf_count = 0
+
+        # Pesos da média móvel ponderada, pré-calculados por tamanho de janela
+        # (linha n = pesos para n leituras, completada com zeros).
+        # Com o buffer cheio, uma versão já rotacionada para cada posição.
+        self._weight_cache = np.zeros((self.buffer_size + 1, self.buffer_size), dtype=np.float32)
+        for n in range(4, self.buffer_size + 1):
+            w = np.exp(np.linspace(-1, 0, n))
+            self._weight_cache[n, :n] = w / w.sum()
+        self._weights_full = np.stack([
+            np.roll(self._weight_cache[self.buffer_size], head)
+            for head in range(self.buffer_size)
+        ])
 
         # Calibração
-        self.calibration_points = []
+        # Pontos de calibração em arrays paralelos, ordenados por distância
+        self._cal_d = np.empty(0, dtype=np.float64)
+        self._cal_v = np.empty(0, dtype=np.float64)
+        self._cal_std = np.empty(0, dtype=np.float64)
         self.interpolation_func = None
+        self._spline_v_min = 0.0  # Faixa de tensão coberta pela calibração
+        self._spline_v_max = 0.0
+        self._spline_x = []       # Nós e coeficientes da spline para avaliação escalar
+        self._spline_c = []
+        self._build_lut()
         self.load_calibration()
 
         # Filtro Kalman
@@ -63,157 +231,401 @@ class GP2Y0A41SK0F:
 
         # Estatísticas
         self.readings_count = 0
-        self.last_reading_time = time.time()
+        self._last_ns = 0      # Instante da última leitura (0 = nenhuma ainda)
+        self._ema_dt_ns = 0.0  # Média móvel exponencial do intervalo entre leituras
+
+        # Amostragem contínua em segundo plano (opcional, ver start_sampling)
+        self._sampling = False
+        self._sample_thread = None
+        self._sample_lock = threading.Lock()
+        self._sample_ring = np.zeros(SAMPLE_RING_SIZE, dtype=np.float64)
+        self._sample_head = 0  # Total de amostras escritas no anel
+        self._sample_error = None  # Exceção que encerrou a thread de amostragem
+
+        # Compila os kernels agora, não na primeira leitura (vale para todo
+        # programa que cria o sensor, inclusive o data_logger)
+        self.warmup()
+
+    def start_sampling(self):
+        """Inicia a leitura contínua do ADC em uma thread de fundo"""
+        if self._sampling:
+            return
+        # Descarta amostras de uma sessão anterior
+        self._sample_head = 0
+        self._sample_error = None
+        self._sampling = True
+        self._sample_thread = threading.Thread(target=self._sample_loop, daemon=True)
+        self._sample_thread.start()
+
+    def stop_sampling(self):
+        """Para a thread de leitura contínua"""
+        self._sampling = False
+        if self._sample_thread is not None:
+            self._sample_thread.join()
+            self._sample_thread = None
+
+    def _sample_loop(self):
+        """Lê o ADC na cadência do data rate e grava no buffer circular"""
+        ch = self.channel
+        read = type(ch).voltage.fget
+        deadline = time.perf_counter()
+        errors = 0
+        while self._sampling:
+            try:
+                voltage = read(ch)
+            except OSError as e:
+                # Falhas transitórias de I2C (ex.: errno 121) são comuns no Pi:
+                # tenta de novo na próxima conversão, desiste após várias seguidas
+                errors += 1
+                if errors >= SAMPLE_MAX_ERRORS:
+                    self._sample_error = e
+                    self._sampling = False
+                    break
+            else:
+                errors = 0
+                with self._sample_lock:
+                    self._sample_ring[self._sample_head % SAMPLE_RING_SIZE] = voltage
+                    self._sample_head += 1
+
+            deadline += self._sample_period
+            remaining = deadline - time.perf_counter()
+            if remaining > 0:
+                _precise_sleep(remaining)
+            else:
+                deadline = time.perf_counter()
+
+    def _latest_samples(self, samples):
+        """
+        Copia as amostras mais recentes do buffer da thread de fundo
+        Retorna None se a thread parou (o anel ficaria congelado) ou não
+        produziu a primeira amostra a tempo
+        """
+        thread = self._sample_thread
+        if thread is None or not thread.is_alive():
+            self._sampling_failed()
+            return None
+
+        # Aguarda a primeira conversão logo após start_sampling
+        limit = time.perf_counter() + SAMPLE_START_TIMEOUT
+        while self._sample_head == 0:
+            if not thread.is_alive() or time.perf_counter() > limit:
+                self._sampling_failed()
+                return None
+            time.sleep(self._sample_period)
+
+        with self._sample_lock:
+            head = self._sample_head
+            n = min(samples, head, SAMPLE_RING_SIZE)
+            idx = np.arange(head - n, head) % SAMPLE_RING_SIZE
+            return self._sample_ring[idx]
+
+    def _read_samples(self, samples):
+        """Lê amostras brutas do ADC em sequência, na cadência do data rate"""
+        # Referências locais: evita buscar atributos a cada amostra
+        ch = self.channel
+        read = type(ch).voltage.fget
+        period = self._sample_period
+        clock = time.perf_counter
+        sleep = _precise_sleep
+
+        voltages = np.empty(samples, dtype=np.float64)
+        deadline = clock()
+        for i in range(samples):
+            voltages[i] = read(ch)
+
+            # Espera apenas o que falta para a próxima conversão do ADC
+            deadline += period
+            remaining = deadline - clock()
+            if remaining > 0:
+                sleep(remaining)
+
+        return voltages
+
+    def _sampling_failed(self):
+        """Desliga a amostragem em segundo plano após falha da thread"""
+        self._sampling = False
+        reason = self._sample_error or "sem amostras da thread"
+        print(f"\n⚠ Amostragem em segundo plano interrompida ({reason}); lendo o ADC diretamente")
 
     def read_voltage(self, samples=10):
         """Lê a tensão com média de múltiplas amostras"""
-        voltages = []
-        for _ in range(samples):
-            voltages.append(self.channel.voltage)
-            time.sleep(0.001)  # 1ms entre leituras
-
-        # Remove outliers usando IQR
-        q1, q3 = np.percentile(voltages, [25, 75])
-        iqr = q3 - q1
-        lower_bound = q1 - 1.5 * iqr
-        upper_bound = q3 + 1.5 * iqr
-        filtered = [v for v in voltages if lower_bound <= v <= upper_bound]
-
-        if not filtered:
-            filtered = voltages
-
-        voltage = np.mean(filtered)
-        self.voltage_buffer.append(voltage)
+        voltages = None
+        if self._sampling:
+            # Amostras já coletadas em segundo plano: não bloqueia no I2C
+            voltages = self._latest_samples(samples)
+        if voltages is None:
+            voltages = self._read_samples(samples)
+
+        # Remove outliers com média aparada: descarta 20% de cada extremo
+        # (seleção parcial O(n), sem ordenar nem montar máscara)
+        n = len(voltages)
+        k = n // 5
+        if k:
+            part = np.partition(voltages, [k, n - 1 - k])
+            voltage = float(part[k:n - k].mean())
+        else:
+            voltage = float(voltages.mean())
+        self._vbuf[self._vbuf_idx] = voltage
+        self._vbuf_idx = (self._vbuf_idx + 1) % self.buffer_size
+        self._vbuf_count = min(self._vbuf_count + 1, self.buffer_size)
         return voltage
 
+    def voltage_std(self):
+        """Desvio padrão das últimas tensões lidas (0 com menos de 2 leituras)"""
+        n = self._vbuf_count
+        if n < 2:
+            return 0.0
+        return float(self._vbuf[:n].std())
+
     def voltage_to_distance_default(self, voltage):
-        """Converte tensão em distância usando a curva característica do sensor"""
+        """
+        Converte tensão em distância usando a curva característica do sensor
+        Aceita um escalar (retorna float) ou um array de tensões
+        """
         # Curva característica do GP2Y0A41SK0F (aproximação)
         # Baseado no datasheet: V = k / (d + offset)
 
-        if voltage < 0.25:
-            return self.max_distance
-        if voltage > 3.3:
-            return self.min_distance
-
         # Fórmula empírica para GP2Y0A41SK0F
         # Ajustada para o range de 4-30cm
-        try:
-            # Modelo: distance = a / (voltage - b) - c
-            # Valores típicos para este sensor
-            a = 12.0
-            b = 0.04
-            c = 0.42
+        # Modelo: distance = a / (voltage - b) - c
+        # Valores típicos para este sensor
+        a = 12.0
+        b = 0.04
+        c = 0.42
+        mn, mx = self.min_distance, self.max_distance
 
-            distance = a / (voltage - b) - c
+        if not isinstance(voltage, (np.ndarray, list, tuple)):
+            # Caminho escalar (leitura a leitura) compilado, sem criar arrays
+            return float(_default_curve(float(voltage), a, b, c, mn, mx))
 
-            # Limita ao range do sensor
-            distance = np.clip(distance, self.min_distance, self.max_distance)
+        v = np.asarray(voltage, dtype=np.float64)
 
-        except:
-            distance = self.max_distance
+        # Denominador limitado para evitar divisão por zero
+        distance = a / np.maximum(v - b, 1e-6) - c
 
-        return distance
+        # Fora da faixa útil de tensão satura nos extremos
+        distance = np.where(v < 0.25, mx, np.where(v > 3.3, mn, distance))
+
+        # Limita ao range do sensor
+        return np.clip(distance, mn, mx)
 
     def voltage_to_distance(self, voltage):
-        """Converte tensão em distância usando calibração ou curva padrão"""
-        if self.interpolation_func is not None:
-            # Usa calibração personalizada
-            distance = float(self.interpolation_func(voltage))
-        else:
-            # Usa curva característica padrão
-            distance = self.voltage_to_distance_default(voltage)
+        """
+        Converte tensão em distância usando calibração ou curva padrão
+        Avaliação exata, referência pública para a tabela usada nas leituras
+        (voltage_to_distance_fast) e para a versão vetorizada (..._batch)
+        """
+        if self.interpolation_func is None:
+            # Usa curva característica padrão (já limitada ao range)
+            return self.voltage_to_distance_default(voltage)
+
+        # Usa calibração personalizada; fora da faixa calibrada satura
+        # nos extremos, como o fill_value do antigo interp1d
+        mn, mx = self.min_distance, self.max_distance
+        if voltage < self._spline_v_min:
+            return mx
+        if voltage > self._spline_v_max:
+            return mn
+        distance = self._eval_spline(voltage)
 
         # Aplica limites físicos do sensor
-        distance = np.clip(distance, self.min_distance, self.max_distance)
+        return mn if distance < mn else (mx if distance > mx else distance)
 
-        return distance
+    def voltage_to_distance_fast(self, voltage):
+        """Converte tensão em distância pela tabela pré-calculada (O(1))"""
+        return float(_lut_lookup(self._lut, voltage))
+
+    def _eval_spline(self, voltage):
+        """Avalia a spline de calibração em um escalar (busca binária + Horner)"""
+        x = self._spline_x
+        i = bisect.bisect_right(x, voltage) - 1
+        if i < 0:
+            i = 0
+        elif i > len(x) - 2:
+            i = len(x) - 2
+
+        c0, c1, c2, c3 = self._spline_c[i]
+        dx = voltage - x[i]
+        return ((c0 * dx + c1) * dx + c2) * dx + c3
+
+    def voltage_to_distance_batch(self, voltages):
+        """Converte um array de tensões em distâncias de uma só vez"""
+        v = np.asarray(voltages, dtype=np.float64)
+
+        if self.interpolation_func is None:
+            return self.voltage_to_distance_default(v)
+
+        # Fora da faixa calibrada a spline retorna NaN: satura nos extremos
+        distances = self.interpolation_func(v)
+        distances = np.where(v < self._spline_v_min, self.max_distance,
+                             np.where(v > self._spline_v_max, self.min_distance, distances))
+
+        return np.clip(distances, self.min_distance, self.max_distance)
 
     def kalman_filter(self, measurement):
         """Aplica filtro Kalman para suavizar leituras"""
+        # As leituras passam a flag direto para os kernels (_filter_step,
+        # _acquire_batch); este método fica para uso avulso
         if not self.kalman_enabled:
             return measurement
 
-        # Predição
-        self.kalman_p = self.kalman_p + self.kalman_q
+        x, p = self.kalman_x, self.kalman_p
+        x, p = _kalman_step(x, p, measurement, self.kalman_q, self.kalman_r)
+        self.kalman_x, self.kalman_p = x, p
 
-        # Atualização
-        k = self.kalman_p / (self.kalman_p + self.kalman_r)
-        self.kalman_x = self.kalman_x + k * (measurement - self.kalman_x)
-        self.kalman_p = (1 - k) * self.kalman_p
+        return x
 
-        return self.kalman_x
+    def warmup(self):
+        """Compila os kernels numba antes da primeira leitura (não altera o estado)"""
+        x, p, q, r = self.kalman_x, self.kalman_p, self.kalman_q, self.kalman_r
+        _kalman_step(x, p, x, q, r)
+        _default_curve(1.0, 12.0, 0.04, 0.42, self.min_distance, self.max_distance)
+        _lut_lookup(self._lut, 1.0)
+        _acquire_batch(np.ones(1), self._lut, True, x, p, q, r)
+        _filter_step(x, True, x, p, q, r, self._dbuf.copy(), self._dbuf_idx,
+                     self._dbuf_count, self._weight_cache, self._weights_full)
 
     def read_distance(self, filtered=True):
         """Lê a distância com opção de filtragem"""
-        voltage = self.read_voltage()
-        distance = self.voltage_to_distance(voltage)
+        _, distance, _ = self.read_voltage_and_distance(filtered=filtered)
+        return distance
 
-        if filtered:
-            distance = self.kalman_filter(distance)
-            self.distance_buffer.append(distance)
+    def read_voltage_and_distance(self, samples=10, filtered=True):
+        """
+        Lê tensão e distância a partir de um único lote de amostras
+        Returns:
+            (tensão, distância, distância sem filtro)
+        """
+        voltage = self.read_voltage(samples=samples)
+        distance_raw = self.voltage_to_distance_fast(voltage)
+        distance = distance_raw
 
-            # Média móvel ponderada
-            if len(self.distance_buffer) > 3:
-                weights = np.exp(np.linspace(-1, 0, len(self.distance_buffer)))
-                weights /= weights.sum()
-                distance = np.average(list(self.distance_buffer), weights=weights)
+        if filtered:
+            # Kalman + buffer circular + média ponderada em um único kernel
+            (distance, self.kalman_x, self.kalman_p,
+             self._dbuf_idx, self._dbuf_count) = _filter_step(
+                distance, bool(self.kalman_enabled),
+                self.kalman_x, self.kalman_p, self.kalman_q, self.kalman_r,
+                self._dbuf, self._dbuf_idx, self._dbuf_count,
+                self._weight_cache, self._weights_full
+            )
+            distance = float(distance)
 
         self.readings_count += 1
-        self.last_reading_time = time.time()
+        now = time.monotonic_ns()
+        last, ema = self._last_ns, self._ema_dt_ns
+        self._last_ns = now
+        if last:
+            dt = now - last
+            if not ema:
+                # Primeiro intervalo entre duas leituras da sessão
+                self._ema_dt_ns = float(dt)
+            elif dt > RATE_GAP_FACTOR * ema:
+                # Pausa longa: recomeça a média a partir do próximo intervalo
+                self._ema_dt_ns = 0.0
+            else:
+                self._ema_dt_ns = 0.9 * ema + 0.1 * dt
 
-        return distance
+        return voltage, distance, distance_raw
+
+    def read_distances_batch(self, n, filtered=True):
+        """
+        Lê n amostras brutas e converte o lote inteiro de uma vez
+        Returns:
+            (tensões, distâncias) como arrays de tamanho n
+        """
+        voltages = self._read_samples(n)
+
+        # Tabela + Kalman sequencial (continuando do estado atual) em um kernel
+        distances, self.kalman_x, self.kalman_p = _acquire_batch(
+            voltages, self._lut, filtered and bool(self.kalman_enabled),
+            self.kalman_x, self.kalman_p, self.kalman_q, self.kalman_r
+        )
+
+        self.readings_count += n
+        return voltages, distances
 
     def calibrate_point(self, actual_distance):
         """Adiciona um ponto de calibração"""
         print(f"\nCalibrando para {actual_distance}cm...")
         print("Coletando 50 amostras...")
 
-        voltages = []
+        voltages = np.empty(50, dtype=np.float64)
         for i in range(50):
-            v = self.read_voltage(samples=5)
-            voltages.append(v)
-            print(f"\rProgresso: {i+1}/50 - Tensão: {v:.3f}V", end="")
+            voltages[i] = self.read_voltage(samples=5)
+            print(f"\rProgresso: {i+1}/50 - Tensão: {voltages[i]:.3f}V", end="")
             time.sleep(0.1)
 
-        avg_voltage = np.mean(voltages)
-        std_voltage = np.std(voltages)
-
-        self.calibration_points.append({
-            'distance': actual_distance,
-            'voltage': avg_voltage,
-            'std': std_voltage
-        })
+        avg_voltage = float(voltages.mean())
+        std_voltage = float(voltages.std())
 
         print(f"\n✓ Calibrado: {actual_distance}cm = {avg_voltage:.3f}V (±{std_voltage:.3f}V)")
 
-        # Ordena pontos por distância
-        self.calibration_points.sort(key=lambda x: x['distance'])
+        self._set_calibration_arrays(
+            np.append(self._cal_d, actual_distance),
+            np.append(self._cal_v, avg_voltage),
+            np.append(self._cal_std, std_voltage)
+        )
 
         # Atualiza interpolação se temos pontos suficientes
-        if len(self.calibration_points) >= 3:
+        if len(self._cal_d) >= 3:
             self.update_interpolation()
 
         return avg_voltage, std_voltage
 
+    @property
+    def calibration_points(self):
+        """Pontos de calibração como lista de dicionários (formato do arquivo)"""
+        return [
+            {'distance': float(d), 'voltage': float(v), 'std': float(s)}
+            for d, v, s in zip(self._cal_d, self._cal_v, self._cal_std)
+        ]
+
+    def _set_calibration_arrays(self, distances, voltages, stds):
+        """Substitui os pontos de calibração, mantendo-os ordenados por distância"""
+        order = np.argsort(distances, kind='stable')
+        self._cal_d = np.asarray(distances, dtype=np.float64)[order]
+        self._cal_v = np.asarray(voltages, dtype=np.float64)[order]
+        self._cal_std = np.asarray(stds, dtype=np.float64)[order]
+
+    def clear_calibration(self):
+        """Remove todos os pontos de calibração e volta à curva padrão"""
+        self._set_calibration_arrays([], [], [])
+        self.interpolation_func = None
+        self._build_lut()
+
+    def _build_lut(self):
+        """Pré-calcula a curva atual (calibrada ou padrão) em uma tabela float32"""
+        voltages = np.linspace(0.0, LUT_V_MAX, LUT_SIZE)
+        self._lut = self.voltage_to_distance_batch(voltages).astype(np.float32)
+
     def update_interpolation(self):
         """Atualiza função de interpolação com pontos calibrados"""
-        if len(self.calibration_points) < 3:
+        if len(self._cal_d) < 3:
             print("Necessário pelo menos 3 pontos para interpolação")
             return
 
-        voltages = [p['voltage'] for p in self.calibration_points]
-        distances = [p['distance'] for p in self.calibration_points]
+        # Importado só aqui: sem calibração o scipy nunca é carregado
+        from scipy import interpolate
 
-        # Cria função de interpolação cúbica
-        self.interpolation_func = interpolate.interp1d(
-            voltages, distances,
-            kind='cubic',
-            bounds_error=False,
-            fill_value=(self.max_distance, self.min_distance)
+        # Spline cúbica (PPoly) exige tensões em ordem crescente
+        order = np.argsort(self._cal_v)
+        voltages = self._cal_v[order]
+        distances = self._cal_d[order]
+
+        self.interpolation_func = interpolate.CubicSpline(
+            voltages, distances, extrapolate=False
         )
+        self._spline_v_min = voltages[0]
+        self._spline_v_max = voltages[-1]
+
+        # Coeficientes por intervalo em listas Python: a avaliação escalar
+        # evita o overhead de chamar o PPoly a cada leitura
+        self._spline_x = self.interpolation_func.x.tolist()
+        self._spline_c = self.interpolation_func.c.T.tolist()
+        self._build_lut()
 
-        print(f"✓ Interpolação atualizada com {len(self.calibration_points)} pontos")
+        print(f"✓ Interpolação atualizada com {len(self._cal_d)} pontos")
 
     def save_calibration(self, filename="sensor_calibration.json"):
         """Salva calibração em arquivo"""
@@ -227,55 +639,101 @@ class GP2Y0A41SK0F:
             }
         }
 
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(filename, 'w') as f:
+                json.dump(data, f, indent=2)
+
+        # Cópia binária: carregada sem parse de JSON na inicialização
+        np.savez(self._calibration_cache_path(filename),
+                 d=self._cal_d, v=self._cal_v, s=self._cal_std,
+                 q=self.kalman_q, r=self.kalman_r)
 
         print(f"✓ Calibração salva em {filename}")
 
-    def load_calibration(self, filename="sensor_calibration.json"):
-        """Carrega calibração de arquivo"""
+    def _load_calibration_cache(self, cache):
+        """Lê o cache .npz; retorna False se estiver corrompido ou incompleto"""
         try:
-            with open(filename, 'r') as f:
-                data = json.load(f)
+            with np.load(cache) as data:
+                d, v, s = data['d'], data['v'], data['s']
+                q, r = float(data['q']), float(data['r'])
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile, EOFError):
+            # Ex.: arquivo truncado por queda de energia durante o save
+            return False
 
-            self.calibration_points = data['calibration_points']
+        self._set_calibration_arrays(d, v, s)
+        self.kalman_q, self.kalman_r = q, r
+        return True
 
-            if 'kalman_params' in data:
-                self.kalman_q = data['kalman_params']['q']
-                self.kalman_r = data['kalman_params']['r']
+    @staticmethod
+    def _calibration_cache_path(filename):
+        """Caminho do cache .npz correspondente ao arquivo de calibração"""
+        return os.path.splitext(filename)[0] + '.npz'
 
-            if len(self.calibration_points) >= 3:
+    def load_calibration(self, filename="sensor_calibration.json"):
+        """Carrega calibração de arquivo"""
+        try:
+            cache = self._calibration_cache_path(filename)
+            loaded = False
+            if os.path.exists(cache) and (not os.path.exists(filename) or
+                                          os.path.getmtime(cache) >= os.path.getmtime(filename)):
+                # Cache binário em dia com o JSON: arrays prontos para a spline
+                loaded = self._load_calibration_cache(cache)
+
+            if not loaded:
+                if orjson is not None:
+                    with open(filename, 'rb') as f:
+                        data = orjson.loads(f.read())
+                else:
+                    with open(filename, 'r') as f:
+                        data = json.load(f)
+
+                points = data['calibration_points']
+                self._set_calibration_arrays(
+                    [p['distance'] for p in points],
+                    [p['voltage'] for p in points],
+                    [p['std'] for p in points]
+                )
+
+                if 'kalman_params' in data:
+                    self.kalman_q = data['kalman_params']['q']
+                    self.kalman_r = data['kalman_params']['r']
+
+            if len(self._cal_d) >= 3:
                 self.update_interpolation()
 
-            print(f"✓ Calibração carregada: {len(self.calibration_points)} pontos")
+            print(f"✓ Calibração carregada: {len(self._cal_d)} pontos")
             return True
-        except:
+        except (OSError, ValueError, KeyError):
+            # Arquivo ausente/ilegível, JSON inválido (JSONDecodeError é ValueError)
+            # ou formato incompleto
             print("⚠ Nenhuma calibração encontrada, usando curva padrão")
             return False
 
     def plot_calibration_curve(self):
         """Plota curva de calibração"""
+        # Importado só aqui: o matplotlib é pesado e só é usado para plotar
+        import matplotlib.pyplot as plt
+
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
 
         # Gera pontos para plotagem
         voltages = np.linspace(0.2, 3.3, 100)
 
         # Curva padrão
-        distances_default = [self.voltage_to_distance_default(v) for v in voltages]
+        distances_default = self.voltage_to_distance_default(voltages)
         ax1.plot(voltages, distances_default, 'b-', label='Curva Padrão', alpha=0.5)
 
         # Curva calibrada
         if self.interpolation_func is not None:
-            distances_calibrated = [self.voltage_to_distance(v) for v in voltages]
+            distances_calibrated = self.voltage_to_distance_batch(voltages)
             ax1.plot(voltages, distances_calibrated, 'r-', label='Curva Calibrada', linewidth=2)
 
         # Pontos de calibração
-        if self.calibration_points:
-            cal_v = [p['voltage'] for p in self.calibration_points]
-            cal_d = [p['distance'] for p in self.calibration_points]
-            cal_std = [p['std'] for p in self.calibration_points]
-
-            ax1.errorbar(cal_v, cal_d, xerr=cal_std, fmt='go',
+        if len(self._cal_d):
+            ax1.errorbar(self._cal_v, self._cal_d, xerr=self._cal_std, fmt='go',
                         markersize=8, label='Pontos Calibrados', capsize=5)
 
         ax1.set_xlabel('Tensão (V)')
@@ -287,16 +745,10 @@ class GP2Y0A41SK0F:
         ax1.set_ylim([0, 35])
 
         # Gráfico de erro
-        if self.interpolation_func is not None and self.calibration_points:
-            errors = []
-            distances = []
-
-            for point in self.calibration_points:
-                measured = point['distance']
-                predicted = float(self.interpolation_func(point['voltage']))
-                error = predicted - measured
-                errors.append(error)
-                distances.append(measured)
+        if self.interpolation_func is not None and len(self._cal_d):
+            # Avalia a spline em todos os pontos de uma vez
+            distances = self._cal_d
+            errors = self.interpolation_func(self._cal_v) - distances
 
             ax2.scatter(distances, errors, c='red', s=50)
             ax2.axhline(y=0, color='k', linestyle='-', alpha=0.3)
@@ -318,27 +770,28 @@ class GP2Y0A41SK0F:
 
     def get_statistics(self):
         """Retorna estatísticas das leituras"""
-        if len(self.distance_buffer) == 0:
+        if self._dbuf_count == 0:
             return None
 
-        distances = list(self.distance_buffer)
-        voltages = list(self.voltage_buffer)
+        distances = self._dbuf[:self._dbuf_count]
+        d_mean, d_std = _mean_std(distances)
+        v_mean, v_std = _mean_std(self._vbuf[:self._vbuf_count])
 
         stats = {
             'readings_count': self.readings_count,
             'distance': {
-                'current': distances[-1] if distances else 0,
-                'mean': np.mean(distances),
-                'std': np.std(distances),
-                'min': np.min(distances),
-                'max': np.max(distances)
+                'current': self._dbuf[self._dbuf_idx - 1],
+                'mean': d_mean,
+                'std': d_std,
+                'min': distances.min(),
+                'max': distances.max()
             },
             'voltage': {
-                'current': voltages[-1] if voltages else 0,
-                'mean': np.mean(voltages),
-                'std': np.std(voltages)
+                'current': self._vbuf[self._vbuf_idx - 1],
+                'mean': v_mean,
+                'std': v_std
             },
-            'rate_hz': 1.0 / (time.time() - self.last_reading_time)
+            'rate_hz': 1e9 / self._ema_dt_ns if self._ema_dt_ns > 0 else 0.0
         }
 
         return stats
@@ -376,8 +829,7 @@ def calibration_wizard(sensor):
                 print("Valor inválido!")
 
         elif choice == '2':
-            sensor.calibration_points = []
-            sensor.interpolation_func = None
+            sensor.clear_calibration()
             print("✓ Calibração limpa")
 
         elif choice == '3':
@@ -406,31 +858,27 @@ def test_mode(sensor):
     print("="*50)
     print("Pressione Ctrl+C para sair\n")
 
+    frame = 0
     try:
         while True:
-            # Leitura com filtragem
-            distance = sensor.read_distance(filtered=True)
-
-            # Leitura bruta para comparação
-            voltage = sensor.channel.voltage
-            distance_raw = sensor.voltage_to_distance(voltage)
-
-            # Estatísticas
-            stats = sensor.get_statistics()
+            # Leitura com filtragem; a distância sem filtro vem do mesmo lote
+            voltage, distance, distance_raw = sensor.read_voltage_and_distance(filtered=True)
 
-            # Display
-            print(f"\r", end="")
-            print(f"Dist: {distance:5.1f}cm (Raw: {distance_raw:5.1f}cm) | ", end="")
-            print(f"V: {voltage:.3f}V | ", end="")
+            if frame % DISPLAY_EVERY == 0:
+                # Estatísticas
+                stats = sensor.get_statistics()
 
-            if stats:
-                print(f"σ: {stats['distance']['std']:.2f}cm | ", end="")
-                print(f"Rate: {stats['rate_hz']:.1f}Hz", end="")
+                # Barra visual
+                bar_len = int((distance - 4) / 26 * BAR_WIDTH)
+                bar_len = 0 if bar_len < 0 else (BAR_WIDTH if bar_len > BAR_WIDTH else bar_len)
 
-            # Barra visual
-            bar_len = int((distance - 4) / 26 * 30)
-            bar = "█" * bar_len + "░" * (30 - bar_len)
-            print(f" [{bar}]", end="")
+                # Display (linha inteira em uma única escrita)
+                status = (f"σ: {stats['distance']['std']:.2f}cm | Rate: {stats['rate_hz']:.1f}Hz"
+                          if stats else "")
+                sys.stdout.write(f"\rDist: {distance:5.1f}cm (Raw: {distance_raw:5.1f}cm) | "
+                                 f"V: {voltage:.3f}V | {status} [{PROGRESS_BARS[bar_len]}]")
+                sys.stdout.flush()
+            frame += 1
 
             time.sleep(0.05)
 
@@ -499,16 +947,14 @@ def main():
             actual = float(input("Distância real (cm): "))
 
             print("Coletando 100 amostras...")
-            distances = []
+            distances = np.empty(100, dtype=np.float32)
 
             for i in range(100):
-                d = sensor.read_distance(filtered=True)
-                distances.append(d)
+                distances[i] = sensor.read_distance(filtered=True)
                 print(f"\rProgresso: {i+1}/100", end="")
                 time.sleep(0.05)
 
-            mean_d = np.mean(distances)
-            std_d = np.std(distances)
+            mean_d, std_d = _mean_std(distances)
             error = mean_d - actual
             error_pct = (error / actual) * 100
 
@@ -7,6 +7,14 @@ Verifica se o hardware está conectado corretamente
 import time
 import sys
 
+# Registradores do ADS1115 para leitura direta (sem o driver Adafruit)
+ADS_ADDRESS = 0x48
+ADS_REG_CONVERSION = 0x00
+ADS_REG_CONFIG = 0x01
+# AIN0 x GND, ganho 1 (±4.096V), conversão contínua, 128 SPS, comparador desligado
+ADS_CONFIG_A0_CONTINUOUS = 0x4283
+ADS_LSB_VOLTS = 4.096 / 32768
+
 print("\n" + "="*50)
 print("TESTE DE CONEXÃO - GP2Y0A41SK0F + ADS1115")
 print("="*50)
@@ -73,6 +81,33 @@ print("- ADS1115 SCL → RPi GPIO3 (Pino 5)")
 print("- ADS1115 SDA → RPi GPIO2 (Pino 3)")
 print("- ADS1115 ADDR → GND (endereço 0x48)")
 
+# Com o ADS1115 confirmado, lê o registrador de conversão diretamente:
+# em modo contínuo cada amostra é uma única transação I2C
+bus = None
+try:
+    from smbus2 import SMBus
+
+    bus = SMBus(1)
+    bus.write_i2c_block_data(ADS_ADDRESS, ADS_REG_CONFIG,
+                             [ADS_CONFIG_A0_CONTINUOUS >> 8, ADS_CONFIG_A0_CONTINUOUS & 0xFF])
+
+    def read_adc():
+        """Lê (tensão, valor bruto) do registrador de conversão"""
+        hi, lo = bus.read_i2c_block_data(ADS_ADDRESS, ADS_REG_CONVERSION, 2)
+        value = (hi << 8) | lo
+        if value & 0x8000:
+            value -= 1 << 16
+        return value * ADS_LSB_VOLTS, value
+except (ImportError, OSError):
+    # smbus2 ausente ou /dev/i2c-1 indisponível/erro de I2C: usa o canal Adafruit
+    if bus is not None:
+        bus.close()
+        bus = None
+
+    def read_adc():
+        """Lê (tensão, valor bruto) pelo driver Adafruit"""
+        return channel.voltage, channel.value
+
 print("\n" + "-"*50)
 print("Lendo valores por 10 segundos...")
 print("(Mova um objeto na frente do sensor)")
@@ -86,8 +121,7 @@ try:
 
     while time.time() - start_time < 10:
         # Lê tensão
-        voltage = channel.voltage
-        value = channel.value
+        voltage, value = read_adc()
 
         readings.append(voltage)
         min_v = min(min_v, voltage)
@@ -149,4 +183,7 @@ except KeyboardInterrupt:
     print("\n\nTeste interrompido pelo usuário")
 except Exception as e:
     print(f"\n\n✗ Erro durante leitura: {e}")
-    sys.exit(1)
\ No newline at end of file
+    sys.exit(1)
+finally:
+    if bus is not None:
+        bus.close()
\ No newline at end of file
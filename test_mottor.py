@@ -1,4 +1,4 @@
-import RPi.GPIO as GPIO
+import pigpio
 import time
 
 # --- Configuração dos Pinos GPIO (use os números BCM) ---
@@ -15,39 +15,56 @@ PASSOS_PARA_360 = 3200
 # Comece com um valor seguro (0.001) e diminua para testar
 PULSE_DELAY = 0.001
 
-# Configurar GPIO
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(STEP_PIN, GPIO.OUT)
-GPIO.setup(DIR_PIN, GPIO.OUT)
-GPIO.setup(ENABLE_PIN, GPIO.OUT)
+# Meio período do pulso em microssegundos (HIGH/LOW), usado na forma de onda
+HALF_PULSE_US = int(PULSE_DELAY * 1e6 / 2)
+
+# Configurar GPIO (requer o daemon pigpiod rodando: sudo pigpiod)
+pi = pigpio.pi()
+if not pi.connected:
+    raise SystemExit("pigpiod não está rodando (execute: sudo pigpiod)")
+
+pi.set_mode(STEP_PIN, pigpio.OUTPUT)
+pi.set_mode(DIR_PIN, pigpio.OUTPUT)
+pi.set_mode(ENABLE_PIN, pigpio.OUTPUT)
+
+# Forma de onda em uso, visível para a limpeza no finally
+wid = None
 
 def girar_360():
+    global wid
     print("Iniciando rotação de 360 graus...")
 
     # Habilitar o driver (definir ENABLE como LOW)
-    GPIO.output(ENABLE_PIN, GPIO.LOW)
+    pi.write(ENABLE_PIN, 0)
 
     # Definir a direção (LOW para um lado, HIGH para o outro)
-    GPIO.output(DIR_PIN, GPIO.HIGH)
+    pi.write(DIR_PIN, 1)
 
     # Pausa para garantir que a direção foi setada
     time.sleep(0.1)
 
-    # Enviar os pulsos
-    for i in range(PASSOS_PARA_360):
-        GPIO.output(STEP_PIN, GPIO.HIGH)
-        time.sleep(PULSE_DELAY / 2) # Divide o delay para o pulso HIGH/LOW
-        GPIO.output(STEP_PIN, GPIO.LOW)
-        time.sleep(PULSE_DELAY / 2)
+    # Forma de onda de um único passo, repetida pelo próprio pigpiod:
+    # os pulsos são gerados por DMA, sem laço em Python
+    step_mask = 1 << STEP_PIN
+    pi.wave_clear()
+    pi.wave_add_generic([
+        pigpio.pulse(step_mask, 0, HALF_PULSE_US),
+        pigpio.pulse(0, step_mask, HALF_PULSE_US),
+    ])
+    wid = pi.wave_create()
 
-        # Opcional: imprimir progresso
-        if (i % 400 == 0):
-            print(f"Progresso: {i}/{PASSOS_PARA_360}")
+    # Enviar os pulsos: loop start / wave / loop PASSOS_PARA_360 vezes
+    pi.wave_chain([
+        255, 0, wid,
+        255, 1, PASSOS_PARA_360 & 0xFF, PASSOS_PARA_360 >> 8,
+    ])
+    while pi.wave_tx_busy():
+        time.sleep(0.01)
 
     print("Rotação completa.")
 
     # Desabilitar o driver (opcional, economiza energia mas libera o motor)
-    # GPIO.output(ENABLE_PIN, GPIO.HIGH)
+    # pi.write(ENABLE_PIN, 1)
 
 try:
     girar_360()
@@ -56,5 +73,10 @@ except KeyboardInterrupt:
     print("Rotação interrompida.")
 
 finally:
-    GPIO.cleanup()
-    print("GPIOs limpos.")
\ No newline at end of file
+    # Deixa o pigpiod parado e sem formas de onda, qualquer que seja a saída
+    pi.wave_tx_stop()
+    if wid is not None:
+        pi.wave_delete(wid)
+    pi.write(STEP_PIN, 0)
+    pi.stop()
+    print("GPIOs limpos.")